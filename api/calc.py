@@ -1,9 +1,15 @@
 from http.server import BaseHTTPRequestHandler
+import hashlib
+import io
 import json
+import math
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, date, timedelta
-from decimal import Decimal, getcontext, ROUND_HALF_UP
-from collections import OrderedDict
-from typing import List, Dict, Optional
+from decimal import Decimal, localcontext, ROUND_HALF_UP
+from functools import lru_cache
+from itertools import chain, islice, repeat
+from typing import Dict, List, Literal, Optional, TextIO, Union
 import urllib.request
 import urllib.parse
 import ssl
@@ -14,129 +20,173 @@ try:
 except Exception:
     HAS_CERTIFI = False
 
-getcontext().prec = 34
+try:
+    import numpy as np  # type: ignore
+    from numba import njit  # type: ignore
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+# Shared Decimal constants, so hot paths don't rebuild them on every call
+D0 = Decimal(0)
+D1 = Decimal(1)
+D100 = Decimal(100)
+QMONEY = Decimal("0.01")
+Q18 = Decimal("1e-18")  # SONIA compounded-factor precision
+BASIS_DECS = {365: Decimal(365), 360: Decimal(360)}
+
+# Decimal day counts for the common 1..7-day business-day segments
+DAY_DECS = [Decimal(i) for i in range(8)]
+
+# Parsed rate tables kept per warm instance, and how long a table from a URL
+# without ETag/Last-Modified is reused
+CSV_CACHE_SIZE = 32
+CSV_CACHE_TTL = 3600
+# Seconds a URL's validator is trusted before it is re-checked with a HEAD
+CSV_VALIDATOR_TTL = 60
+# Parsed-row cap for uploaded/downloaded CSVs (~80 years of daily fixings)
+MAX_ROWS = 20_000
+# Longest CSV line read before rejecting; a rate row is a few dozen characters
+MAX_LINE_CHARS = 4096
+
+# Daily-detail rows per chunk when they are streamed
+DETAILS_CHUNK_ROWS = 366
 
 # -------- Core calculation utilities (extracted/minified from desktop app) -------- #
 
 def parse_rate_input(value: str) -> Decimal:
     x = Decimal(str(value).strip())
-    return x / Decimal(100) if x > 1 else x
+    return x / D100 if x > 1 else x
+
+
+def parse_iso_date(value: str) -> date:
+    """YYYY-MM-DD via the date.fromisoformat fast path; strptime only as a fallback."""
+    s = str(value).strip()
+    try:
+        return date.fromisoformat(s)
+    except ValueError:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def rate_to_decimal(r) -> Decimal:
+    """Decimal view of a parsed rate. Floats are read back at 15 significant digits
+    (exact for any decimal input of that length), so 5.1234 / 100 gives 0.051234."""
+    return r if isinstance(r, Decimal) else Decimal(format(r, '.15g'))
 
 
 def quantize_money(x: Decimal) -> Decimal:
-    return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return x.quantize(QMONEY, rounding=ROUND_HALF_UP)
 
 
-def previous_business_day(bdays: List[date], d: date) -> date:
-    lo, hi = 0, len(bdays) - 1
-    ans = None
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        if bdays[mid] <= d:
-            ans = bdays[mid]
-            lo = mid + 1
-        else:
-            hi = mid - 1
-    if ans is None:
+def previous_business_day_index(bdays: List[date], d: date) -> int:
+    i = bisect_right(bdays, d) - 1
+    if i < 0:
         raise ValueError(f"No business day on/before {d} in the supplied rates.")
-    return ans
+    return i
 
 
-def shift_back_business_days(bdays_index: Dict[date, int], bdays: List[date], d: date, n: int) -> date:
-    if d not in bdays_index:
-        raise ValueError(f"{d} is not a business day in the supplied rates.")
-    i = bdays_index[d] - n
-    if i < 0:
-        raise ValueError(f"Rates do not go back {n} business days before {d}. Add more history.")
-    return bdays[i]
-
-
-def next_business_day(bdays: List[date], d: date) -> date:
-    lo, hi = 0, len(bdays) - 1
-    ans = None
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        if bdays[mid] >= d:
-            ans = bdays[mid]
-            hi = mid - 1
-        else:
-            lo = mid + 1
-    if ans is None:
-        raise ValueError(f"No business day on/after {d} in the supplied rates.")
-    return ans
+def sort_rates_by_date(rate_map: Dict[date, float]) -> Dict[date, float]:
+    """Return rate_map ordered by date; already-ordered input (the usual CSV) is
+    returned as is after an O(B) check instead of being re-sorted."""
+    keys = list(rate_map)
+    if all(a < b for a, b in zip(keys, islice(keys, 1, None))):
+        return rate_map
+    return dict(sorted(rate_map.items()))
+
 
+def _bounded_lines(f: TextIO):
+    """Yield the lines of `f`, never buffering more than MAX_LINE_CHARS of one
+    line, so a newline-free body is rejected instead of read whole."""
+    for line in iter(lambda: f.readline(MAX_LINE_CHARS), ''):
+        if len(line) >= MAX_LINE_CHARS and line[-1] not in '\r\n':
+            raise ValueError("CSV line exceeds length limit")
+        yield line
 
-def parse_csv_content(content: str) -> OrderedDict:
+
+def parse_csv_content(content: Union[str, TextIO]) -> Dict[date, float]:
     """Parse CSV content with date in first col (YYYY-MM-DD) and rate in second.
-    Accepts header or no header; rates can be percent or decimal."""
+    Accepts header or no header; rates can be percent or decimal and are
+    returned as float fractions (see rate_to_decimal for the audit path).
+    `content` may be a string or a text stream, which is read row by row;
+    more than MAX_ROWS rows after the header (blank ones included), or a line
+    over MAX_LINE_CHARS, is rejected."""
     import csv
-    from io import StringIO
-
-    f = StringIO(content)
-    # Robust dialect detection with fallback
-    try:
-        sniffer = csv.Sniffer()
-        sample = f.read(2048)
-        f.seek(0)
-        try:
-            dialect = sniffer.sniff(sample) if sample else csv.excel
-        except csv.Error:
-            dialect = csv.excel
-    except Exception:
-        dialect = csv.excel
 
-    reader = csv.reader(f, dialect)
-    rows = []
+    f = io.StringIO(content) if isinstance(content, str) else content
+    lines = _bounded_lines(f)
+    # Comma by default; a comma-free first line with a tab (or semicolon)
+    # selects that delimiter instead. No csv.Sniffer pass over a 2KB sample.
+    first_line = next(lines, '')
+    delimiter = ','
+    if ',' not in first_line:
+        delimiter = next((d for d in ('\t', ';') if d in first_line), ',')
+    reader = csv.reader(chain([first_line], lines), delimiter=delimiter)
 
     # Check first row; if not a date, treat as header
     first = next(reader, None)
     def is_date_str(x: str) -> bool:
         try:
-            datetime.strptime(x.strip(), "%Y-%m-%d")
+            parse_iso_date(x)
             return True
         except Exception:
             return False
     if first is not None and (len(first) >= 2 and is_date_str(first[0])):
-        rows.append(first)
-    for row in reader:
-        if not row or len(row) < 2:
-            continue
-        rows.append(row)
+        reader = chain([first], reader)
 
     dmap = {}
-    for r in rows:
+    n_rows = 0
+    for r in reader:
+        # Count every row read, blank or short ones too, so junk lines can't
+        # keep an unbounded body streaming past the cap
+        n_rows += 1
+        if n_rows > MAX_ROWS:
+            raise ValueError("CSV exceeds row limit")
+        if not r or len(r) < 2:
+            continue
         try:
-            d = datetime.strptime(str(r[0]).strip(), "%Y-%m-%d").date()
+            d = parse_iso_date(r[0])
         except Exception:
             continue
         try:
-            raw = Decimal(str(r[1]).strip())
+            raw = float(r[1])
         except Exception:
             continue
-        rate_dec = raw / Decimal(100) if raw > 1 else raw
-        dmap[d] = rate_dec
+        if not math.isfinite(raw):
+            continue
+        dmap[d] = raw / 100.0 if raw > 1 else raw
 
     if not dmap:
         raise ValueError("No valid rate data found in CSV content")
 
-    return OrderedDict(sorted(dmap.items(), key=lambda kv: kv[0]))
+    return sort_rates_by_date(dmap)
 
 
-def download_csv_from_url(url: str) -> str:
-    """Download CSV content from an HTTPS URL. Supports Google Drive share links.
-    Tries verified SSL first (using certifi if available), then falls back to a
-    non-verifying SSL context as a last resort to avoid CERTIFICATE_VERIFY_FAILED.
-    """
+def direct_download_url(url: str) -> str:
+    """Rewrite Google Drive share links to their direct-download form."""
     if 'drive.google.com' in url and '/file/d/' in url:
         try:
             file_id = url.split('/file/d/')[1].split('/')[0]
-            url = f"https://drive.google.com/uc?export=download&id={file_id}"
+            return f"https://drive.google.com/uc?export=download&id={file_id}"
         except Exception:
             pass
+    return url
 
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
 
-    def _open_with_context(context: ssl.SSLContext) -> bytes:
+def download_csv_from_url(url: str) -> TextIO:
+    """Open CSV content at an HTTPS URL as a text stream; the caller reads and
+    closes it. Supports Google Drive share links.
+    Tries verified SSL first (using certifi if available), then falls back to a
+    non-verifying SSL context as a last resort to avoid CERTIFICATE_VERIFY_FAILED.
+    """
+    req = urllib.request.Request(direct_download_url(url), headers={"User-Agent": "Mozilla/5.0"})
+
+    def _open_with_context(context: ssl.SSLContext):
         opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=context))
         return opener.open(req, timeout=30)
 
@@ -145,33 +195,213 @@ def download_csv_from_url(url: str) -> str:
         ctx = ssl.create_default_context()
         if HAS_CERTIFI:
             ctx.load_verify_locations(certifi.where())
-        data = _open_with_context(ctx).read()
+        resp = _open_with_context(ctx)
     except Exception:
         # Fallback: non-verifying SSL (insecure; acceptable for public CSV if needed)
         try:
             ctx = ssl.create_default_context()
             ctx.check_hostname = False
             ctx.verify_mode = ssl.CERT_NONE
-            data = _open_with_context(ctx).read()
+            resp = _open_with_context(ctx)
         except Exception as e:
             raise ValueError(f"Failed to download CSV: {e}")
 
-    # Try to decode using server-declared charset, then utf-8 fallback
+    # Decode using the server-declared charset from the same response, then utf-8 fallback
+    content_type = resp.headers.get('Content-Type', '')
+    charset = 'utf-8'
+    if 'charset=' in content_type:
+        charset = content_type.split('charset=')[-1].split(';')[0].strip() or 'utf-8'
     try:
-        # Make a lightweight HEAD-equivalent to get charset if possible
-        # If not available, default to utf-8
-        charset = 'utf-8'
-        content_type = ''
+        return io.TextIOWrapper(resp, encoding=charset, errors='replace', newline='')
+    except LookupError:
+        return io.TextIOWrapper(resp, encoding='utf-8', errors='replace', newline='')
+
+
+# -------- Rate table cache (warm serverless instances) -------- #
+
+def csv_url_validator(url: str) -> str:
+    """Return the ETag/Last-Modified of `url` via a HEAD request. Servers that
+    send neither get a time bucket so tables expire after
+    CSV_CACHE_TTL seconds. Only verified SSL is tried, so hosts that need the
+    insecure download fallback also land in the time bucket."""
+    req = urllib.request.Request(direct_download_url(url), method="HEAD", headers={"User-Agent": "Mozilla/5.0"})
+    validator = None
+    try:
+        ctx = ssl.create_default_context()
+        if HAS_CERTIFI:
+            ctx.load_verify_locations(certifi.where())
+        opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=ctx))
+        with opener.open(req, timeout=10) as resp:
+            validator = resp.headers.get('ETag') or resp.headers.get('Last-Modified')
+    except Exception:
+        pass
+    return validator or f"ttl:{int(time.time() // CSV_CACHE_TTL)}"
+
+
+@lru_cache(maxsize=CSV_CACHE_SIZE)
+def _fetch_and_parse(url: str, validator: str) -> Dict[date, float]:
+    # Parsed straight off the response: no full-body bytes or decoded copy
+    with download_csv_from_url(url) as stream:
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                content_type = resp.headers.get('Content-Type', '')
-        except Exception:
-            pass
-        if 'charset=' in content_type:
-            charset = content_type.split('charset=')[-1].split(';')[0].strip()
-        return data.decode(charset or 'utf-8', errors='replace')
+            return parse_csv_content(stream)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to download CSV: {e}")
+
+
+_CSV_URL_VALIDATORS: Dict[str, tuple] = {}
+
+
+def load_rates_from_url(url: str) -> Dict[date, float]:
+    """Download and parse a rate CSV, reusing the parsed table while the
+    server-side validator is unchanged. A validator younger than
+    CSV_VALIDATOR_TTL seconds is reused without a HEAD round trip.
+    Callers must not mutate the result."""
+    now = time.monotonic()
+    # Same insertion-order LRU as _CSV_TEXT_CACHE
+    checked = _CSV_URL_VALIDATORS.pop(url, None)
+    if checked is None or now - checked[0] > CSV_VALIDATOR_TTL:
+        checked = (now, csv_url_validator(url))
+    _CSV_URL_VALIDATORS[url] = checked
+    if len(_CSV_URL_VALIDATORS) > CSV_CACHE_SIZE:
+        del _CSV_URL_VALIDATORS[next(iter(_CSV_URL_VALIDATORS))]
+    return _fetch_and_parse(url, checked[1])
+
+
+_CSV_TEXT_CACHE: Dict[str, Dict[date, float]] = {}
+
+
+def load_rates_from_text(content: str) -> Dict[date, float]:
+    """parse_csv_content memoized on a digest of the CSV text (LRU, CSV_CACHE_SIZE entries).
+    Callers must not mutate the result."""
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    # dicts keep insertion order: re-inserting a hit makes it the most recent,
+    # and the first key is always the least recently used
+    rates = _CSV_TEXT_CACHE.pop(key, None)
+    if rates is None:
+        rates = parse_csv_content(content)
+    _CSV_TEXT_CACHE[key] = rates
+    if len(_CSV_TEXT_CACHE) > CSV_CACHE_SIZE:
+        del _CSV_TEXT_CACHE[next(iter(_CSV_TEXT_CACHE))]
+    return rates
+
+
+def _sum_log_factors(bday_ord, rate_arr, start_ord: int, end_ord: int, basis: int) -> float:
+    """Sum log1p(r * n / N) over consecutive business-day segments of [start, end).
+
+    bday_ord[k] is the business day governing segment k (k=0 is the one on/before
+    start) and rate_arr[k] its observed rate; segment k runs to bday_ord[k+1] or end.
+    """
+    log_c = 0.0
+    seg_start = start_ord
+    for k in range(len(rate_arr)):
+        seg_end = end_ord
+        if k + 1 < len(bday_ord) and bday_ord[k + 1] < end_ord:
+            seg_end = bday_ord[k + 1]
+        log_c += math.log1p(rate_arr[k] * (seg_end - seg_start) / basis)
+        seg_start = seg_end
+    return log_c
+
+
+if HAS_NUMBA:
+    try:
+        _sum_log_factors_jit = njit('f8(i8[:], f8[:], i8, i8, i8)', cache=True, fastmath=True)(_sum_log_factors)
     except Exception:
-        return data.decode('utf-8', errors='replace')
+        # e.g. no writable cache directory on a read-only serverless bundle
+        HAS_NUMBA = False
+
+
+def _walk_segments(bdays, bday_ord, rate_values, first_i, start_ord, end_ord,
+                   lookback_bdays, basis_days, inv_N, is_sonia, high_precision):
+    """Yield (i, obs_idx, seg_start, seg_end, r_f, acc) per business-day segment.
+
+    Business day i governs the calendar days up to the next business day (clipped
+    to [start, end)) and observes the rate `lookback_bdays` positions earlier.
+    `acc` is the running compounded factor C (Decimal) with `high_precision`,
+    otherwise the running sum of log1p terms (float).
+    """
+    n_bdays = len(bday_ord)
+    acc = D1 if high_precision else 0.0
+    i = first_i
+    seg_start = start_ord
+    while seg_start < end_ord:
+        seg_end = min(bday_ord[i + 1], end_ord) if i + 1 < n_bdays else end_ord
+        days_applied = seg_end - seg_start
+        obs_idx = i - lookback_bdays
+        r = rate_values[obs_idx]
+        r_f = float(r)
+
+        if high_precision:
+            days_dec = DAY_DECS[days_applied] if days_applied < len(DAY_DECS) else Decimal(days_applied)
+            period_factor = D1 + rate_to_decimal(r) * days_dec * inv_N
+            acc *= period_factor
+            if is_sonia:
+                acc = acc.quantize(Q18, rounding=ROUND_HALF_UP)
+        else:
+            acc += math.log1p(r_f * days_applied / basis_days)
+
+        yield i, obs_idx, seg_start, seg_end, r_f, acc
+        seg_start = seg_end
+        i += 1
+
+
+def _new_detail_columns() -> dict:
+    """Columnar (SoA) daily details: one list per field, one entry per calendar day."""
+    return {
+        'dates': [],
+        'business_days': [],
+        'observation_dates': [],
+        'daily_rates': [],
+        'cumulative_factors': [],
+        'days_applied': [],
+        'is_business_day': [],
+    }
+
+
+def _extend_detail_columns(cols: dict, bdays, bday_ord, i, obs_idx, seg_start, seg_end, r_f, c_f) -> None:
+    days_applied = seg_end - seg_start
+    cols['dates'].extend(map(date.fromordinal, range(seg_start, seg_end)))
+    cols['business_days'].extend(repeat(bdays[i], days_applied))
+    cols['observation_dates'].extend(repeat(bdays[obs_idx], days_applied))
+    cols['daily_rates'].extend(repeat(r_f, days_applied))
+    cols['cumulative_factors'].extend(repeat(c_f, days_applied))
+    cols['days_applied'].extend(repeat(days_applied, days_applied))
+    # Only a segment's first day can be its business day
+    cols['is_business_day'].append(seg_start == bday_ord[i])
+    cols['is_business_day'].extend(repeat(False, days_applied - 1))
+
+
+def _append_detail_segment(cols: dict, bdays, bday_ord, i, obs_idx, seg_start, seg_end, r_f, c_f) -> None:
+    """One row per segment: `dates` is its first calendar day and `days_applied`
+    its span; every field but the date is constant across that span."""
+    cols['dates'].append(date.fromordinal(seg_start))
+    cols['business_days'].append(bdays[i])
+    cols['observation_dates'].append(bdays[obs_idx])
+    cols['daily_rates'].append(r_f)
+    cols['cumulative_factors'].append(c_f)
+    cols['days_applied'].append(seg_end - seg_start)
+    cols['is_business_day'].append(seg_start == bday_ord[i])
+
+
+DETAIL_ROW_BUILDERS = {
+    'per_day': _extend_detail_columns,
+    'per_segment': _append_detail_segment,
+}
+
+
+def _iter_detail_chunks(segments, bdays, bday_ord, high_precision, add_rows, chunk_rows):
+    """Yield daily-detail columns in chunks of at least `chunk_rows` rows
+    (the last one may be shorter), consuming `segments` lazily."""
+    cols = _new_detail_columns()
+    for i, obs_idx, seg_start, seg_end, r_f, acc in segments:
+        c_f = float(acc) if high_precision else math.exp(acc)
+        add_rows(cols, bdays, bday_ord, i, obs_idx, seg_start, seg_end, r_f, c_f)
+        if len(cols['dates']) >= chunk_rows:
+            yield cols
+            cols = _new_detail_columns()
+    if cols['dates']:
+        yield cols
 
 
 def compute_interest_compounded_in_arrears(
@@ -179,7 +409,7 @@ def compute_interest_compounded_in_arrears(
     start: date,
     end: date,
     lookback_bdays: int,
-    rates: OrderedDict,
+    rates: Dict[date, float],
     basis_days: int,
     margin_pa: Decimal,
     cas_pa: Decimal,
@@ -187,80 +417,99 @@ def compute_interest_compounded_in_arrears(
     margin_pa_after: Optional[Decimal] = None,
     is_sonia: bool = False,
     return_daily_details: bool = False,
+    high_precision: bool = False,
+    stream_daily_details: bool = False,
+    daily_details_mode: Literal['per_day', 'per_segment'] = 'per_segment',
 ) -> dict:
+    """Compound the RFR in arrears and add margin/CAS as simple interest.
+
+    By default the compounded factor is accumulated in float64 (as a sum of
+    log1p terms) and converted to Decimal once for the money arithmetic;
+    `high_precision=True` keeps the audit-grade Decimal product, including the
+    per-step 18dp quantization for SONIA.
+
+    With `stream_daily_details=True` the result carries a lazy
+    `daily_details_stream` generator of column chunks instead of
+    `daily_details`, so the rows are only built as they are sent.
+
+    `daily_details_mode='per_segment'` (the default) emits one row per
+    business-day segment with `days_applied` giving its span in calendar
+    days; 'per_day' expands every calendar day into its own row.
+    """
     if lookback_bdays < 1:
         raise ValueError("Lookback must be at least 1 business day.")
     if end <= start:
         raise ValueError("End date must be after start date.")
-    bdays = list(rates.keys())
+    if daily_details_mode not in DETAIL_ROW_BUILDERS:
+        raise ValueError("daily_details_mode must be 'per_day' or 'per_segment'.")
+    add_detail_rows = DETAIL_ROW_BUILDERS[daily_details_mode]
+    bdays = list(rates)
     if not bdays:
         raise ValueError("No rates provided.")
-    bdays_index = {bd: i for i, bd in enumerate(bdays)}
 
     # Validate we have sufficient history for the first block at the start boundary
-    first_needed_bd = previous_business_day(bdays, start)
-    _ = shift_back_business_days(bdays_index, bdays, first_needed_bd, lookback_bdays)
+    first_i = previous_business_day_index(bdays, start)
+    if first_i - lookback_bdays < 0:
+        raise ValueError(f"Rates do not go back {lookback_bdays} business days before {bdays[first_i]}. Add more history.")
 
     # Extend business-day calendar forward to `end` using weekdays, so we can
     # compute accruals even if the last available rate is before `end`, provided
     # lookback can map each forward business day to an earlier observation date.
     last_rate_day = bdays[-1]
     if last_rate_day < end:
-        extended = list(bdays)
         d_ext = last_rate_day + timedelta(days=1)
         while d_ext <= end:
             if d_ext.weekday() < 5:  # Monday=0 .. Friday=4
-                extended.append(d_ext)
+                bdays.append(d_ext)
             d_ext += timedelta(days=1)
-        bdays = extended
-        bdays_index = {bd: i for i, bd in enumerate(bdays)}
 
-    N = Decimal(basis_days)
-    C = Decimal(1)
-
-    daily_details = [] if return_daily_details else None
-
-    current_date = start
-    while current_date < end:
-        if current_date in bdays:
-            business_day = current_date
-            next_bd = next_business_day(bdays, current_date + timedelta(days=1))
+    rate_values = list(rates.values())
+    bday_ord = [bd.toordinal() for bd in bdays]
+    start_ord = start.toordinal()
+    end_ord = end.toordinal()
+
+    N = BASIS_DECS[basis_days] if basis_days in BASIS_DECS else Decimal(basis_days)
+    inv_N = D1 / N
+
+    # first_i/last_i bound the business days whose segments fall in [start, end)
+    last_i = bisect_left(bday_ord, end_ord) - 1
+    if last_i - lookback_bdays >= len(rate_values):
+        raise ValueError(f"No rate available for observation date {bdays[len(rate_values)]}. Add more history.")
+
+    def segments():
+        return _walk_segments(bdays, bday_ord, rate_values, first_i, start_ord, end_ord,
+                              lookback_bdays, basis_days, inv_N, is_sonia, high_precision)
+
+    daily_details = None
+    if not high_precision and not return_daily_details:
+        seg_ords = bday_ord[first_i:last_i + 2]
+        seg_rates = [float(r) for r in rate_values[first_i - lookback_bdays:last_i - lookback_bdays + 1]]
+        if HAS_NUMBA:
+            log_c = _sum_log_factors_jit(
+                np.array(seg_ords, dtype=np.int64), np.array(seg_rates, dtype=np.float64),
+                start_ord, end_ord, basis_days,
+            )
         else:
-            business_day = previous_business_day(bdays, current_date)
-            # If there is no next business day on/after current_date (e.g., past
-            # the last real rate date), treat the next boundary as `end`.
-            try:
-                next_bd = next_business_day(bdays, current_date)
-            except Exception:
-                next_bd = end
-
-        days_applied = min((next_bd - current_date).days, (end - current_date).days)
-        obs = shift_back_business_days(bdays_index, bdays, business_day, lookback_bdays)
-        r = rates[obs]
+            log_c = _sum_log_factors(seg_ords, seg_rates, start_ord, end_ord, basis_days)
+    else:
+        if return_daily_details:
+            daily_details = _new_detail_columns()
+        for i, obs_idx, seg_start, seg_end, r_f, acc in segments():
+            if daily_details is not None:
+                c_f = float(acc) if high_precision else math.exp(acc)
+                add_detail_rows(daily_details, bdays, bday_ord, i, obs_idx, seg_start, seg_end, r_f, c_f)
+        if high_precision:
+            C = acc
+        else:
+            log_c = acc
 
-        period_factor = Decimal(1) + (r * Decimal(days_applied) / N)
-        C *= period_factor
+    if not high_precision:
+        # expm1 keeps the (C - 1) digits that a plain exp() would cancel away
+        C = D1 + Decimal(math.expm1(log_c))
         if is_sonia:
-            C = C.quantize(Decimal('0.000000000000000001'), rounding=ROUND_HALF_UP)
-
-        if return_daily_details:
-            for i in range(days_applied):
-                detail_date = current_date + timedelta(days=i)
-                if detail_date < end:
-                    daily_details.append({
-                        'date': detail_date.isoformat(),
-                        'business_day': business_day.isoformat(),
-                        'observation_date': obs.isoformat(),
-                        'daily_rate': float(r),
-                        'cumulative_factor': float(C),
-                        'days_applied': days_applied,
-                        'is_business_day': (detail_date == business_day)
-                    })
-
-        current_date += timedelta(days=days_applied)
+            C = C.quantize(Q18, rounding=ROUND_HALF_UP)
 
     dc = Decimal((end - start).days)
-    dcf_total = dc / N
 
     pre_days = int(dc)
     post_days = 0
@@ -282,17 +531,22 @@ def compute_interest_compounded_in_arrears(
             pre_days = (eff - start).days
             post_days = (end - eff).days
 
-    dcf_pre = Decimal(pre_days) / N
-    dcf_post = Decimal(post_days) / N
+    # 34-digit precision only for the money arithmetic; the compounding above
+    # runs at the default context precision (28 digits).
+    with localcontext() as ctx:
+        ctx.prec = 34
+        dcf_total = dc / N
+        dcf_pre = Decimal(pre_days) / N
+        dcf_post = Decimal(post_days) / N
 
-    interest_rfr = (C - Decimal(1)) * principal
-    interest_margin = (m1 * dcf_pre + m2 * dcf_post) * principal
-    interest_cas = cas_pa * dcf_total * principal
-    interest_total = interest_rfr + interest_margin + interest_cas
+        interest_rfr = (C - D1) * principal
+        interest_margin = (m1 * dcf_pre + m2 * dcf_post) * principal
+        interest_cas = cas_pa * dcf_total * principal
+        interest_total = interest_rfr + interest_margin + interest_cas
 
-    rfr_annualized = (C - Decimal(1)) * (N / dc) if dc != 0 else Decimal(0)
-    margin_pa_weighted = ((m1 * dcf_pre + m2 * dcf_post) / (dcf_total if dcf_total != 0 else Decimal(1))) if dc != 0 else Decimal(0)
-    applicable_annualized_rate = rfr_annualized + margin_pa_weighted + cas_pa
+        rfr_annualized = (C - D1) * (N / dc) if dc != 0 else D0
+        margin_pa_weighted = ((m1 * dcf_pre + m2 * dcf_post) / (dcf_total if dcf_total != 0 else D1)) if dc != 0 else D0
+        applicable_annualized_rate = rfr_annualized + margin_pa_weighted + cas_pa
 
     result = {
         "interest_total": float(quantize_money(interest_total)),
@@ -306,58 +560,127 @@ def compute_interest_compounded_in_arrears(
         "N": int(N),
         "margin_breakdown": {
             "pre": {"days": pre_days, "margin_pa": float(m1)},
-            "post": {"days": post_days, "margin_pa": float(m2), "effective_date": eff.isoformat() if eff else None},
+            "post": {"days": post_days, "margin_pa": float(m2), "effective_date": eff},
         },
     }
 
+    if return_daily_details or stream_daily_details:
+        result["daily_details_mode"] = daily_details_mode
     if return_daily_details:
         result["daily_details"] = daily_details
+    elif stream_daily_details:
+        result["daily_details_stream"] = _iter_detail_chunks(
+            segments(), bdays, bday_ord, high_precision, add_detail_rows, DETAILS_CHUNK_ROWS)
 
     return result
 
 
 # -------- HTTP handler for Vercel Serverless Function -------- #
 
+def _json_default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def json_dumps(payload) -> bytes:
+    """Serialize a response body; orjson when installed (dates natively), else stdlib json."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_json_default).encode("utf-8")
+
+
+def json_loads(raw: bytes):
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
 class handler(BaseHTTPRequestHandler):
-    def _send(self, status: int, payload: dict):
-        body = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
+    # HTTP/1.1 so streamed responses can use chunked transfer encoding; every
+    # other response closes the connection, as under the default HTTP/1.0,
+    # since a body we did not read (no Content-Length) would otherwise be
+    # parsed as the next request
+    protocol_version = "HTTP/1.1"
+
+    def _send_close_header(self):
+        self.send_header("Connection", "close")
+        self.close_connection = True
+
+    def _send_cors_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def _send(self, status: int, payload: dict):
+        stream = payload.pop("daily_details_stream", None)
+        if stream is not None:
+            return self._send_stream(status, payload, stream)
+        body = json_dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self._send_cors_headers()
+        self._send_close_header()
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _send_stream(self, status: int, payload: dict, chunks):
+        """NDJSON over chunked encoding: the summary object first, then one
+        {"daily_details": {...columns...}} line per chunk as it is built."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self._send_cors_headers()
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write_chunk(json_dumps(payload) + b"\n")
+            while True:
+                # Only failures building a chunk are reported in-band; the
+                # status line has already gone out
+                try:
+                    cols = next(chunks, None)
+                except Exception as e:
+                    self._write_chunk(json_dumps({"error": str(e)}) + b"\n")
+                    break
+                if cols is None:
+                    break
+                self._write_chunk(json_dumps({"daily_details": cols}) + b"\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            # Client went away mid-stream: nothing more can be sent
+            self.close_connection = True
+
     def do_OPTIONS(self):
         self.send_response(204)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self._send_cors_headers()
+        self._send_close_header()
         self.end_headers()
 
     def do_POST(self):
         try:
             length = int(self.headers.get('content-length', '0'))
             raw = self.rfile.read(length) if length > 0 else b''
-            data = json.loads(raw.decode('utf-8')) if raw else {}
+            data = json_loads(raw) if raw else {}
         except Exception:
             return self._send(400, {"error": "Invalid JSON body"})
 
         try:
             principal = Decimal(str(data.get('principal')))
-            start = datetime.strptime(data.get('start_date'), "%Y-%m-%d").date()
-            end = datetime.strptime(data.get('end_date'), "%Y-%m-%d").date()
+            start = parse_iso_date(data.get('start_date'))
+            end = parse_iso_date(data.get('end_date'))
             pricing_option = data.get('pricing_option', 'SONIA').upper()
             lookback = int(data.get('lookback', 5))
-            margin_pa = parse_rate_input(str(data.get('margin'))) if 'margin' in data else Decimal('0')
-            cas_pa = parse_rate_input(str(data.get('cas'))) if 'cas' in data else Decimal('0')
+            margin_pa = parse_rate_input(str(data.get('margin'))) if 'margin' in data else D0
+            cas_pa = parse_rate_input(str(data.get('cas'))) if 'cas' in data else D0
 
             margin_after = data.get('margin_after')
             margin_change_date_str = data.get('margin_change_date')
             margin_pa_after = parse_rate_input(str(margin_after)) if margin_after is not None else None
-            margin_change_date = datetime.strptime(margin_change_date_str, "%Y-%m-%d").date() if margin_change_date_str else None
+            margin_change_date = parse_iso_date(margin_change_date_str) if margin_change_date_str else None
 
             # Input rates: either explicit 'rates', or 'csv_text', or 'csv_url'
             rates_input = data.get('rates')
@@ -372,19 +695,23 @@ class handler(BaseHTTPRequestHandler):
                     raise ValueError("'rates' must be a non-empty array of {date, rate}")
                 rate_map = {}
                 for item in rates_input:
-                    d = datetime.strptime(str(item['date']), "%Y-%m-%d").date()
-                    raw = Decimal(str(item['rate']))
-                    rate_map[d] = raw / Decimal(100) if raw > 1 else raw
-                rates = OrderedDict(sorted(rate_map.items(), key=lambda kv: kv[0]))
+                    d = parse_iso_date(item['date'])
+                    raw = float(item['rate'])
+                    if not math.isfinite(raw):
+                        raise ValueError(f"Invalid rate for {d}")
+                    rate_map[d] = raw / 100.0 if raw > 1 else raw
+                rates = sort_rates_by_date(rate_map)
             else:
-                # Parse CSV either from text or by downloading
+                # Parse CSV either from text or by downloading (both cached)
                 if csv_text is None and csv_url is not None:
-                    csv_text = download_csv_from_url(str(csv_url))
-                if not isinstance(csv_text, str) or len(csv_text.strip()) == 0:
-                    raise ValueError("CSV content is empty or invalid")
-                rates = parse_csv_content(csv_text)
+                    rates = load_rates_from_url(str(csv_url))
+                else:
+                    if not isinstance(csv_text, str) or len(csv_text.strip()) == 0:
+                        raise ValueError("CSV content is empty or invalid")
+                    rates = load_rates_from_text(csv_text)
 
             basis = 365 if pricing_option == 'SONIA' else 360
+            stream_daily_details = bool(data.get('stream_daily_details', False))
 
             result = compute_interest_compounded_in_arrears(
                 principal=principal,
@@ -398,17 +725,22 @@ class handler(BaseHTTPRequestHandler):
                 margin_change_date=margin_change_date,
                 margin_pa_after=margin_pa_after,
                 is_sonia=(pricing_option == 'SONIA'),
-                return_daily_details=bool(data.get('return_daily_details', False)),
+                return_daily_details=bool(data.get('return_daily_details', False)) and not stream_daily_details,
+                high_precision=bool(data.get('high_precision', False)),
+                stream_daily_details=stream_daily_details,
+                daily_details_mode=data.get('daily_details_mode', 'per_segment'),
             )
 
             # Add last available rate date for UI/context
             try:
-                last_rate_date = max(rates.keys()).isoformat()
-                result["rates_last_date"] = last_rate_date
+                # rates are date-sorted, so the last key is the latest date
+                result["rates_last_date"] = next(reversed(rates))
             except Exception:
                 pass
 
-            return self._send(200, result)
-
         except Exception as e:
             return self._send(400, {"error": str(e)})
+
+        # Outside the try: once a response has started, errors must not turn
+        # into a second (400) response on the same connection
+        return self._send(200, result)